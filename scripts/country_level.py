@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
@@ -9,11 +12,31 @@ from scripts.ids.tools import imf_emde
 from scripts.logger import logger
 
 
+@lru_cache(maxsize=1)
+def _ids_client() -> InternationalDebtStatistics:
+    """Return a shared IDS client, used for metadata lookups."""
+    return InternationalDebtStatistics()
+
+
+@lru_cache(maxsize=1)
+def _african_countries() -> tuple[str, ...]:
+    """Return the (cached) ISO3 codes of African countries in the IDS database."""
+    return tuple(_ids_client().get_african_countries())
+
+
+@lru_cache(maxsize=1)
+def _emde_countries() -> tuple[str, ...]:
+    """Return the (cached) ISO3 codes of IMF EMDE countries."""
+    return tuple(imf_emde())
+
+
 def _download_and_clean_interest_data(country: str) -> pd.DataFrame:
     """Download and clean interest data for all countries."""
     try:
         logger.info(f"Downloading data for {country}")
-        df = get_average_interest(countries=[country])
+        # Each country gets a new IDS client: a client caches the data it loaded,
+        # so reusing it across countries could return another country's data.
+        df = get_average_interest(countries=[country], drop_zero_values=True)
 
     except:
         logger.warning(f"Failed to download data for {country}")
@@ -29,41 +52,64 @@ def _download_and_clean_interest_data(country: str) -> pd.DataFrame:
         )
 
     # Add "(private)" to counterpart_name when indicator_code is "DT.INR.PRVT" else add "(official)"
-    df["counterpart_name"] = np.where(
-        df["indicator_code"] == "DT.INR.PRVT",
-        df["counterpart_name"] + " (private)",
-        df["counterpart_name"] + " (official)",
+    df["counterpart_name"] = df["counterpart_name"] + np.where(
+        df["indicator_code"].to_numpy() == "DT.INR.PRVT", " (private)", " (official)"
     )
 
-    df = (
-        df.loc[lambda d: d.value != 0]
-        .drop(columns="indicator_code")
-        .sort_values(
-            ["counterpart_name", "year"],
-            ascending=(True, False),
-        )
+    df = df.drop(columns="indicator_code")
+    df.sort_values(
+        ["counterpart_name", "year"],
+        ascending=(True, False),
+        inplace=True,
+        kind="stable",
     )
 
     return df
 
 
+def _bulk_download(countries: list[str], out_subdir: str, max_workers: int = 12):
+    """Download interest data for each country concurrently, and save it to CSV and
+    Parquet files inside the `interest_rates/{out_subdir}` output folder.
+
+    Downloads are network-bound, so they are submitted to a thread pool. Files are
+    written from the main thread as each download completes.
+    """
+    output_dir = Paths.output / "interest_rates" / out_subdir
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_download_and_clean_interest_data, country): country
+            for country in countries
+        }
+
+        for future in as_completed(futures):
+            country = futures[future]
+            df = future.result()
+
+            # Skip countries without data, instead of writing a `_nan_nan` file
+            if df.empty:
+                logger.info(f"No interest data for {country}")
+                continue
+
+            years = df["year"].to_numpy()
+            start_year, end_year = years.min(), years.max()
+            # CSV is the published format. The Parquet copy is typed and compressed,
+            # and is what the visualisation scripts read.
+            filename = f"{country}_{start_year}_{end_year}"
+            df.to_csv(output_dir / f"{filename}.csv", index=False)
+            df.to_parquet(
+                output_dir / f"{filename}.parquet", compression="zstd", index=False
+            )
+
+
 def download_interest_data_per_african_country():
     """Download interest data for each African country, and save it to a CSV file."""
 
     # Get the list of African countries
-    african_countries = InternationalDebtStatistics().get_african_countries()
+    african_countries = _african_countries()
 
     # Download interest data for each African country
-    for country in african_countries:
-        df = _download_and_clean_interest_data(country=country)
-        start_year, end_year = df.year.min(), df.year.max()
-        df.to_csv(
-            Paths.output
-            / "interest_rates"
-            / "africa"
-            / f"{country}_{start_year}_{end_year}.csv",
-            index=False,
-        )
+    _bulk_download(countries=african_countries, out_subdir="africa")
 
 
 def download_interest_data_per_emde_country():
@@ -71,25 +117,16 @@ def download_interest_data_per_emde_country():
     and save it to a CSV file."""
 
     # Get the list of African countries
-    african_countries = InternationalDebtStatistics().get_african_countries()
+    african_countries = _african_countries()
 
     # Get the list of EMDE countries
-    emde = imf_emde()
+    emde = _emde_countries()
 
     # EMDE not African
     emde_not_african = list(set(emde) - set(african_countries))
 
-    # Download interest data for each African country
-    for country in emde_not_african:
-        df = _download_and_clean_interest_data(country=country)
-        start_year, end_year = df.year.min(), df.year.max()
-        df.to_csv(
-            Paths.output
-            / "interest_rates"
-            / "emde_non_african"
-            / f"{country}_{start_year}_{end_year}.csv",
-            index=False,
-        )
+    # Download interest data for each EMDE (non-African) country
+    _bulk_download(countries=emde_not_african, out_subdir="emde_non_african")
 
 
 if __name__ == "__main__":
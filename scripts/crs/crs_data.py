@@ -1,9 +1,13 @@
 # Define constants for default settings
+import os
 from pathlib import Path
 from typing import List
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pandas import DataFrame
 
 from scripts.config import Paths
@@ -11,6 +15,9 @@ from scripts.logger import logger
 
 from oda_reader import bulk_download_crs
 
+# Let PyArrow overlap reads across row groups with (at least) one IO thread per core
+pa.set_io_thread_count(max(os.cpu_count() or 1, pa.io_thread_count()))
+
 
 def download_crs():
     """Download CRS data from the OECD website."""
@@ -50,6 +57,9 @@ def read_parquet_file(
 ) -> DataFrame:
     """Read a Parquet file with specified filters and columns.
 
+    The file is scanned as a PyArrow dataset, so that the filters can skip whole
+    row groups (based on their statistics) and only the selected columns are decoded.
+
     Args:
         file_path (Path): Path to the Parquet file.
         filters (List[tuple]): Filters to apply when loading the file.
@@ -59,7 +69,18 @@ def read_parquet_file(
         DataFrame: Filtered and selected data as a DataFrame.
     """
     logger.info(f"Reading data from {file_path}")
-    return pd.read_parquet(file_path, filters=filters, columns=columns)
+    expression = pq.filters_to_expression(filters) if filters else None
+
+    # Pre-buffering coalesces the reads of each row group into fewer, larger requests
+    parquet_format = ds.ParquetFileFormat(
+        default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True)
+    )
+
+    table = ds.dataset(file_path, format=parquet_format).to_table(
+        columns=columns, filter=expression, use_threads=True
+    )
+
+    return table.to_pandas(self_destruct=True)
 
 
 def split_project_number(df: DataFrame, column: str = "project_number") -> DataFrame:
@@ -70,12 +91,19 @@ def split_project_number(df: DataFrame, column: str = "project_number") -> DataF
         column (str): Name of the column to split.
 
     Returns:
-        DataFrame: DataFrame with split project_id, loan_number, and crs_entry columns.
+        DataFrame: DataFrame with split (categorical) project_id and loan_number columns.
     """
     logger.info(f"Splitting '{column}' into components.")
-    split_columns = ["project_id", "loan_or_credit_number", "crs_entry"]
-    df[split_columns] = df[column].str.split(".", expand=True)
-    return df.drop(columns=["crs_entry"])
+    key_columns = ["project_id", "loan_or_credit_number"]
+
+    # Only the first two components are needed, so extract them in a single regex
+    # pass instead of splitting every part (and dropping the crs entry afterwards)
+    df[key_columns] = df[column].str.extract(r"^([^.]*)(?:\.([^.]*))?", expand=True)
+
+    # Categorical keys make the deduplication groupby work on integer codes
+    df[key_columns] = df[key_columns].astype("category")
+
+    return df
 
 
 def deduplicate_crs_data(df: DataFrame) -> DataFrame:
@@ -89,6 +117,11 @@ def deduplicate_crs_data(df: DataFrame) -> DataFrame:
     """
     logger.info("Deduplicating CRS data.")
     df = df.rename(columns={"commitment_date": "board_approval_date"})
+
+    # Use a compact, non-object dtype for the recipient code. Dates are grouped as
+    # they are, so that distinct values stay distinct, and parsed after grouping.
+    df["recipient_code"] = pd.to_numeric(df["recipient_code"], downcast="integer")
+
     df = df.groupby(
         [
             "project_id",
@@ -98,19 +131,30 @@ def deduplicate_crs_data(df: DataFrame) -> DataFrame:
         ],
         dropna=False,
         observed=True,
+        sort=False,
+        as_index=False,
     ).agg(
-        {
-            "interest1": "max",
-            "interest2": "max",
-            "usd_interest": "sum",
-            "usd_received": "sum",
-            "usd_commitment": "sum",
-            "usd_disbursement": "sum",
-        }
+        interest1=("interest1", "max"),
+        interest2=("interest2", "max"),
+        usd_interest=("usd_interest", "sum"),
+        usd_received=("usd_received", "sum"),
+        usd_commitment=("usd_commitment", "sum"),
+        usd_disbursement=("usd_disbursement", "sum"),
+    )
+
+    # Parse the dates on the (much smaller) grouped data
+    df["board_approval_date"] = pd.to_datetime(
+        df["board_approval_date"], format="ISO8601", cache=True
+    )
+
+    # Take the (NaN-aware) max of both rates and rescale it in place, in one buffer
+    interest_rate = np.fmax(
+        df["interest1"].to_numpy(), df["interest2"].to_numpy(), dtype="float64"
     )
+    np.divide(interest_rate, 1000, out=interest_rate)
+    df["interest_rate"] = interest_rate
 
-    df["interest_rate"] = np.fmax(df["interest1"], df["interest2"]) / 1000
-    return df.reset_index().drop(columns=["interest1", "interest2"])
+    return df.drop(columns=["interest1", "interest2"])
 
 
 def drop_missing_interest(df: DataFrame) -> DataFrame:
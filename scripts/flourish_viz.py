@@ -1,20 +1,25 @@
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from scripts.config import Paths
 
+COLUMNS: list[str] = ["entity_name", "counterpart_name", "year", "value"]
+
 
 def line_chart_explore_interest():
     """Reads all interest rates data and pivots entity_name"""
-    dfs = []
 
-    # Identify all csv files inside interest_rates (and subdirectories)
-    for file in Paths.output.rglob("interest_rates/**/*.csv"):
-        df = pd.read_csv(file)
-        dfs.append(df)
+    # Identify all parquet files inside interest_rates (and subdirectories), and read
+    # only the needed columns. The files are small and independent, so they are read
+    # concurrently.
+    files = list(Paths.output.rglob("interest_rates/**/*.parquet"))
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        tables = list(executor.map(partial(pq.read_table, columns=COLUMNS), files))
 
-    data = pd.concat(dfs).drop(
-        columns=["indicator_code", "entity_code", "income_level", "continent"]
-    )
+    data = pa.concat_tables(tables, promote_options="permissive").to_pandas()
 
     data = data.pivot(
         index=["counterpart_name", "year"],
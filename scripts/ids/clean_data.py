@@ -1,8 +1,9 @@
 import pandas as pd
-from bblocks import add_income_level_column, convert_id, set_bblocks_data_path
+from bblocks import add_income_level_column, set_bblocks_data_path
 from bblocks_data_importers import InternationalDebtStatistics
 
 from scripts.config import Paths
+from scripts.ids.tools import convert_unique_ids
 
 set_bblocks_data_path(Paths.raw_data)
 
@@ -11,11 +12,11 @@ def _clean_counterpart_area(df: pd.DataFrame) -> pd.DataFrame:
     """Remove the non-breaking space from the counterpart_area column
     and harmomise the names of the counterpart areas (when possible)."""
     return df.assign(
-        counterpart_name=lambda d: d.counterpart_name.apply(
-            lambda r: r.replace("\xa0", "")
+        counterpart_name=lambda d: d.counterpart_name.str.replace(
+            "\xa0", "", regex=False
         )
     ).assign(
-        counterpart_name=lambda d: convert_id(
+        counterpart_name=lambda d: convert_unique_ids(
             d["counterpart_name"], from_type="regex", to_type="name_short"
         ).map(lambda x: ", ".join(x) if isinstance(x, list) else str(x))
     )
@@ -23,7 +24,7 @@ def _clean_counterpart_area(df: pd.DataFrame) -> pd.DataFrame:
 
 def _add_continent(df: pd.DataFrame) -> pd.DataFrame:
     return df.assign(
-        continent=lambda d: convert_id(
+        continent=lambda d: convert_unique_ids(
             d.entity_name, from_type="regex", to_type="continent"
         )
     )
@@ -33,25 +34,35 @@ def _clean_indicators(
     df: pd.DataFrame,
     filter_columns: bool = True,
     counterparts: list = None,
+    drop_zero_values: bool = False,
 ) -> pd.DataFrame:
     """Clean the IDS data.
 
+    Optionally drop rows with a value of zero, before any other cleaning step.
     Optionally filter counterparts to keep only those in study_counterparts.
     Optionally filter columns to keep only the ones needed for the analysis.
 
     """
 
-    df = (
-        df.pipe(_clean_counterpart_area)
-        .pipe(add_income_level_column, id_column="entity_name", id_type="regex")
-        .pipe(_add_continent)
-        .dropna(subset=["income_level"])
-    )
+    # Drop zero values first, so that names are only converted for rows that are kept.
+    # Missing values compare as NA, and are dropped as well.
+    if drop_zero_values:
+        df = df.loc[df["value"].ne(0).fillna(False)]
 
+    df = df.pipe(_clean_counterpart_area)
+
+    # Filter counterparts as soon as their names are harmonised, so that income
+    # levels and continents are only added for the rows that are kept
     if counterparts is not None:
         if isinstance(counterparts, str):
             counterparts = [counterparts]
-        df = df.query(f"counterpart_name in {counterparts}")
+        df = df.loc[df.counterpart_name.isin(list(counterparts))]
+
+    df = (
+        df.pipe(add_income_level_column, id_column="entity_name", id_type="regex")
+        .pipe(_add_continent)
+        .dropna(subset=["income_level"])
+    )
 
     if filter_columns:
         df = df.filter(
@@ -77,36 +88,49 @@ def get_clean_data(
     indicators: list | dict | str,
     countries: list = None,
     counterparts: list | dict = None,
+    ids: InternationalDebtStatistics = None,
+    drop_zero_values: bool = False,
 ) -> pd.DataFrame:
-    """Get indicator data for each country/counterpart_area pair."""
+    """Get indicator data for each country/counterpart_area pair.
+
+    An existing IDS object can be passed as `ids`. Years and countries are passed to
+    its `get_data` call, so that the object reloads its data when they differ from
+    the previous call.
+
+    If `drop_zero_values` is True, rows with a value of zero are dropped before cleaning.
+    """
 
-    # Create IDS object
-    ids = InternationalDebtStatistics()
+    # Create IDS object, unless one is provided
+    if ids is None:
+        ids = InternationalDebtStatistics()
 
     # Filter years
+    years = None
     if start_year is not None and end_year is not None:
-        ids.set_years(years=range(start_year, end_year + 1))
-
-    # Filter countries
-    if countries is not None:
-        ids.set_economies(economies=countries)
+        years = range(start_year, end_year + 1)
 
-    df = ids.get_data(series=indicators)
+    # Years and countries override the object's configuration for this call
+    df = ids.get_data(series=indicators, years=years, economies=countries)
 
     # Get data and clean it
-    df = df.pipe(_clean_indicators, counterparts=counterparts)
+    df = df.pipe(
+        _clean_indicators,
+        counterparts=counterparts,
+        drop_zero_values=drop_zero_values,
+    )
 
     # Make sure only the right indicators are kept for each counterpart
     if isinstance(indicators, dict):
-        condition = ""
         indicator_types = {v: k for k, v in indicators.items()}
         if counterparts is not None:
-            for counterpart, indicator_type in counterparts.items():
-                condition += (
-                    f"(counterpart_name == '{counterpart}' and "
-                    f"indicator_code == '{indicator_types[indicator_type]}') or "
-                )
-
-            df = df.query(condition[:-4]).reset_index(drop=True)
+            pairs = [
+                (counterpart, indicator_types[indicator_type])
+                for counterpart, indicator_type in counterparts.items()
+            ]
+            keys = pd.MultiIndex.from_arrays(
+                [df["counterpart_name"], df["indicator_code"]]
+            )
+
+            df = df.loc[keys.isin(pairs)].reset_index(drop=True)
 
     return df
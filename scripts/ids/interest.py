@@ -1,6 +1,7 @@
 from typing import Optional
 
 import pandas as pd
+from bblocks_data_importers import InternationalDebtStatistics
 
 from scripts.ids.clean_data import get_clean_data
 
@@ -24,14 +25,22 @@ def get_average_interest(
     end_year: Optional[int] = None,
     countries: Optional[list[str]] = None,
     counterparts: Optional[list[str]] = None,
+    ids: Optional[InternationalDebtStatistics] = None,
+    drop_zero_values: bool = False,
 ) -> pd.DataFrame:
-    """Get data with the weighted average interest rate for each country/counterpart_area pair."""
+    """Get data with the weighted average interest rate for each country/counterpart_area pair.
+
+    An existing IDS client can be passed as `ids` to reuse it across calls.
+    Rows with a zero rate can be dropped before cleaning with `drop_zero_values`.
+    """
     return get_clean_data(
         start_year=start_year,
         end_year=end_year,
         indicators=INTEREST_RATE_INDICATORS,
         countries=countries,
         counterparts=counterparts,
+        ids=ids,
+        drop_zero_values=drop_zero_values,
     )
 
 
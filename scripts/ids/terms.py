@@ -5,6 +5,30 @@ from scripts.ids.interest import get_average_interest, get_interest_payments
 from scripts.ids.commitments import get_commitments
 from scripts.ids.maturity import get_maturities
 
+IDX: list[str] = [
+    "year",
+    "entity_name",
+    "counterpart_name",
+    "continent",
+    "income_level",
+]
+
+
+def _join_on_commitments(
+    commitments: pd.DataFrame, others: dict[str, pd.DataFrame]
+) -> pd.DataFrame:
+    """Left join other indicators onto the commitments data, using IDX as the key.
+
+    `others` maps a column suffix to each DataFrame. All frames are indexed once and
+    joined in a single step, instead of chaining pairwise merges.
+    """
+    joined = commitments.set_index(IDX).add_suffix("_commitments")
+
+    return joined.join(
+        [df.set_index(IDX).add_suffix(suffix) for suffix, df in others.items()],
+        how="left",
+    ).reset_index()
+
 
 def get_merged_rates_commitments_payments_data(
     start_year: int, end_year: int, counterparts: list[str] = None
@@ -36,12 +60,9 @@ def get_merged_rates_commitments_payments_data(
         start_year=start_year, end_year=end_year, counterparts=counterparts
     )
 
-    idx = ["year", "entity_name", "counterpart_name", "continent", "income_level"]
-
     # merge the data and keep only rows with positive commitments
     df = (
-        pd.merge(commitments, rate, on=idx, how="left", suffixes=("_commitments", ""))
-        .merge(payments, on=idx, how="left", suffixes=("", "_payments"))
+        _join_on_commitments(commitments, {"": rate, "_payments": payments})
         .rename(columns={"value": "value_rate"})
         .loc[lambda d: d.value_commitments > 0]
     )
@@ -84,13 +105,12 @@ def get_merged_rates_commitments_grace_maturities_data(
         start_year=start_year, end_year=end_year, counterparts=counterparts
     )
 
-    idx = ["year", "entity_name", "counterpart_name", "continent", "income_level"]
-
     # merge the data and keep only rows with positive commitments
     df = (
-        pd.merge(commitments, rate, on=idx, how="left", suffixes=("_commitments", ""))
-        .merge(grace, on=idx, how="left", suffixes=("", "_grace"))
-        .merge(maturities, on=idx, how="left", suffixes=("", "_maturities"))
+        _join_on_commitments(
+            commitments,
+            {"": rate, "_grace": grace, "_maturities": maturities},
+        )
         .rename(columns={"value": "value_rate"})
         .loc[lambda d: d.value_commitments > 0]
     )
@@ -4,11 +4,42 @@ import pandas as pd
 
 import logging
 
-from bblocks import add_iso_codes_column
+from bblocks import add_iso_codes_column, convert_id
 
 logging.getLogger("country_converter").setLevel(logging.ERROR)
 
 
+# Converted ids, by (from_type, to_type). Shared across calls so that the same names
+# (e.g. the counterparts of every country in the per-country downloads) are only
+# converted once per session.
+_CONVERTED_IDS: dict[tuple[str, str], dict] = {}
+
+
+def convert_unique_ids(values: pd.Series, from_type: str, to_type: str) -> pd.Series:
+    """Convert ids using `convert_id`, running the conversion only once per unique value.
+
+    This is useful for columns with many repeated values (e.g. country names), where
+    the conversion (especially from_type="regex") is far more expensive than a lookup.
+    Conversions are cached, so values already converted in previous calls are not
+    converted again.
+    """
+    converted = _CONVERTED_IDS.setdefault((from_type, to_type), {})
+
+    unique_values = values.unique()
+    new_values = [value for value in unique_values if value not in converted]
+
+    if new_values:
+        new_ids = convert_id(
+            pd.Series(new_values), from_type=from_type, to_type=to_type
+        )
+        converted.update(zip(new_values, new_ids.to_numpy()))
+
+    mapping = pd.Series([converted[value] for value in unique_values], dtype=object)
+    mapping.index = unique_values
+
+    return values.map(mapping)
+
+
 def order_income(
     df: pd.DataFrame, idx: list = None, order: list = None
 ) -> pd.DataFrame:
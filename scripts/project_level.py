@@ -1,7 +1,6 @@
 import logging
 
 import pandas as pd
-from bblocks import convert_id
 
 from scripts.config import Paths
 from scripts.crs.crs_data import (
@@ -9,6 +8,7 @@ from scripts.crs.crs_data import (
     DEFAULT_FILTERS,
     DEFAULT_COLUMNS,
 )
+from scripts.ids.tools import convert_unique_ids
 from scripts.logger import logger
 from scripts.wb.statements_api import get_ida_interest, get_ibrd_interest
 
@@ -25,13 +25,10 @@ def get_crs_reported_projects() -> pd.DataFrame:
     )
 
     # Add ISO3 codes
-    crs_data["iso3"] = convert_id(
+    crs_data["iso3"] = convert_unique_ids(
         crs_data["recipient_code"], from_type="DACCode", to_type="ISO3"
     )
 
-    # Convert dates to datetime
-    crs_data["board_approval_date"] = pd.to_datetime(crs_data["board_approval_date"])
-
     return (
         crs_data.dropna(subset=["interest_rate"])
         .reset_index(drop=True)
@@ -55,10 +52,12 @@ def get_project_level_data() -> pd.DataFrame:
     ibrd_summary = get_ibrd_interest().assign(source="IBRD")
 
     # combine
-    data = pd.concat([ida_summary, ibrd_summary], ignore_index=True)
+    data = pd.concat([ida_summary, ibrd_summary], ignore_index=True, copy=False)
 
     # add iso3 codes
-    data["iso3"] = convert_id(data["country"], from_type="regex", to_type="ISO3")
+    data["iso3"] = convert_unique_ids(
+        data["country"], from_type="regex", to_type="ISO3"
+    )
 
     return data
 
@@ -114,8 +113,17 @@ def get_project_level_interest():
     # Drop missing interest data from the merged data
     missing_interest = missing_interest.loc[lambda d: d.interest_rate.notna()]
 
-    # Combine the two datasets
-    combined_data = pd.concat([project_level_data, missing_interest], ignore_index=True)
+    # Combine the two datasets. Columns are aligned first so that both frames share
+    # the same layout when concatenated.
+    columns = project_level_data.columns.union(missing_interest.columns, sort=False)
+    combined_data = pd.concat(
+        [
+            project_level_data.reindex(columns=columns),
+            missing_interest.reindex(columns=columns),
+        ],
+        ignore_index=True,
+        copy=False,
+    )
 
     # Number of projects with missing interest rates
     projects_with_data = len(combined_data)
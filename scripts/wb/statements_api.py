@@ -1,15 +1,169 @@
 """Module for fetching and processing World Bank interest data from the DataCatalog API."""
 
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Callable
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
 from scripts import config
+from scripts.logger import logger
+
+# orjson parses large JSON payloads several times faster than the standard library.
+# It is optional: the standard library parser is used if it is not installed.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 BASE_URL: str = "https://datacatalogapi.worldbank.org/dexapps/fone/api/apiservice"
 
+# Connect and read timeouts (in seconds) for each page request
+TIMEOUT: tuple[int, int] = (5, 60)
+
+# Number of pages requested concurrently, once the first page is known to be full
+PAGE_WINDOW: int = 8
+
+# Size of the chunks in which responses are read (and decompressed), in bytes
+CHUNK_SIZE: int = 1 << 16
+
+# Format of the dates returned (and accepted in filters) by the API
+DATE_FORMAT: str = "%d-%b-%Y"
+
+# API columns renamed when cleaning a response
+RENAMED_COLUMNS: dict[str, str] = {
+    "end_of_period": "period",
+    "repaid_to_ida_us_": "repayment",
+    "repaid_to_ibrd": "repayment",
+}
+
+# A single comparison in an API filter expression, e.g. "end_of_period>='01-Sep-2024'"
+_FILTER_CONDITION = re.compile(r"^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*'([^']*)'\s*$")
+
+# Version of the summaries saved next to the raw data. Increase it whenever the way
+# summaries are computed changes, so that summaries saved before are not reused.
+SUMMARY_VERSION: int = 1
+
+
+def _create_session() -> requests.Session:
+    """Create a session that keeps its connection alive across pages, and retries
+    failed or throttled requests with a backoff."""
+    session = requests.Session()
+
+    retries = Retry(
+        total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=1, pool_maxsize=PAGE_WINDOW, max_retries=retries),
+    )
+    # Compressed responses are decoded as they are read. Brotli is only accepted if
+    # a decoder for it is installed.
+    session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+
+    return session
+
+
+_SESSION: requests.Session = _create_session()
+
+
+def _to_string_array(values: list) -> pa.Array:
+    """Convert values of mixed types (e.g. numbers and strings) to a string array."""
+    return pa.array(
+        [None if value is None else str(value) for value in values], type=pa.string()
+    )
+
+
+def _records_to_table(records: list[dict]) -> pa.Table:
+    """Convert a list of records to a (columnar) Arrow table.
+
+    Records may omit fields, so the columns are the union of all record keys,
+    in order of first appearance. Columns whose values have mixed types are
+    converted to strings.
+    """
+    columns = dict.fromkeys(key for record in records for key in record)
+
+    arrays = {}
+    for column in columns:
+        values = [record.get(column) for record in records]
+        try:
+            arrays[column] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[column] = _to_string_array(values)
+
+    return pa.table(arrays)
+
+
+def _concat_pages(tables: list[pa.Table]) -> pa.Table:
+    """Concatenate pages, promoting column types that differ between them.
+
+    Columns which can't be promoted (e.g. numbers in one page and strings in
+    another) are converted to strings in all pages.
+    """
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+
+    mixed_columns = {
+        column
+        for column, column_types in types.items()
+        if len(column_types) > 1
+        and not all(
+            pa.types.is_integer(t) or pa.types.is_floating(t) for t in column_types
+        )
+    }
+
+    converted_tables = []
+    for table in tables:
+        for i, name in enumerate(table.column_names):
+            if name in mixed_columns:
+                table = table.set_column(
+                    i, name, _to_string_array(table[name].to_pylist())
+                )
+        converted_tables.append(table)
+
+    return pa.concat_tables(converted_tables, promote_options="permissive")
+
+
+def _fetch_page(request_params: dict, skip: int) -> tuple[pa.Table, Optional[int]]:
+    """Fetch a single page of data, starting at record `skip`, as an Arrow table.
+
+    Also returns the total number of records, if the response reports it.
+    """
+    # The response is streamed in large chunks, rather than the small default ones.
+    with _SESSION.get(
+        BASE_URL,
+        params={**request_params, "skip": skip},
+        timeout=TIMEOUT,
+        stream=True,
+    ) as response:
+        response.raise_for_status()
+        content = b"".join(response.iter_content(chunk_size=CHUNK_SIZE))
+
+    payload = json_loads(content)
+    total = payload.get("count", payload.get("total"))
+
+    return (
+        _records_to_table(payload.get("data", [])),
+        int(total) if total is not None else None,
+    )
+
 
 def fetch_paginated_data(
     dataset_id: str,
@@ -21,6 +175,12 @@ def fetch_paginated_data(
 ) -> pd.DataFrame:
     """Fetches data from the World Bank API with pagination.
 
+    After the first page, the remaining pages are requested concurrently using the
+    shared session. If the response reports the total number of records, the pages
+    up to that total are requested at once. Any further pages (or all of them, if no
+    total is reported) are requested in windows of PAGE_WINDOW requests until the
+    last (short) page is found.
+
     Args:
         dataset_id: Identifier for the dataset.
         resource_id: Identifier for the resource within the dataset.
@@ -45,27 +205,44 @@ def fetch_paginated_data(
     if filter_expression:
         request_params["filter"] = filter_expression
 
-    all_data = []
-    skip = 0
-
-    while True:
-        # Update skip for pagination
-        request_params["skip"] = skip
-
-        response = requests.get(BASE_URL, params=request_params)
-        response.raise_for_status()
-
-        payload = response.json()
-        data_batch = payload.get("data", [])
-        all_data.extend(data_batch)
-
-        # If the returned data is smaller than max_records, we've reached the last page
-        if len(data_batch) < max_records:
-            break
+    # Fetch the first page. If it is full, there may be more pages.
+    first_page, total = _fetch_page(request_params, skip=0)
+    pages = [first_page]
+
+    def fetch(skip: int) -> pa.Table:
+        return _fetch_page(request_params, skip=skip)[0]
+
+    if first_page.num_rows == max_records:
+        with ThreadPoolExecutor(max_workers=PAGE_WINDOW) as executor:
+            skip = max_records
+
+            if total is not None:
+                # The total is known, so request the remaining pages at once
+                skips = range(skip, total, max_records)
+                pages.extend(executor.map(fetch, skips))
+                skip += len(skips) * max_records
+
+            # Request any following pages in windows of concurrent requests, until
+            # a short (last) page is found. Pages past the end are simply empty.
+            # This also covers a reported total which is too low.
+            while pages[-1].num_rows == max_records:
+                window_end = skip + PAGE_WINDOW * max_records
+                pages.extend(executor.map(fetch, range(skip, window_end, max_records)))
+                skip = window_end
+
+    # Pages are kept as Arrow tables, and only converted to pandas once combined.
+    # Types can differ between pages (e.g. a column with only nulls in one page).
+    tables = [page for page in pages if page.num_rows > 0]
+    n_rows = sum(table.num_rows for table in tables)
+    if total is not None and n_rows != total:
+        logger.warning(
+            f"Fetched {n_rows} records for {resource_id}, but {total} were reported"
+        )
 
-        skip += max_records
+    if not tables:
+        return pd.DataFrame()
 
-    return pd.DataFrame(all_data)
+    return _concat_pages(tables).to_pandas()
 
 
 def clean_ida_ibrd_response(df: pd.DataFrame) -> pd.DataFrame:
@@ -82,24 +259,80 @@ def clean_ida_ibrd_response(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         A cleaned, standardized DataFrame.
     """
-    # Convert date columns if they exist
-    if "end_of_period" in df.columns:
-        df["end_of_period"] = pd.to_datetime(
-            df["end_of_period"], format="%d-%b-%Y", errors="coerce"
-        )
-    if "board_approval_date" in df.columns:
-        df["board_approval_date"] = pd.to_datetime(
-            df["board_approval_date"], format="%d-%b-%Y", errors="coerce"
-        )
+    # Convert date columns if they exist. These columns have few distinct dates, so
+    # each unique string is parsed only once (cache=True) and mapped back.
+    for column in ["end_of_period", "board_approval_date"]:
+        if column in df.columns:
+            df[column] = pd.to_datetime(
+                df[column], format=DATE_FORMAT, errors="coerce", cache=True
+            )
+
+    # Merge the repayment columns into one. Renaming both to 'repayment' would
+    # instead create two columns with the same label.
+    repaid_columns = [
+        c for c in ["repaid_to_ida_us_", "repaid_to_ibrd"] if c in df.columns
+    ]
+    if len(repaid_columns) == 2:
+        df["repayment"] = df["repaid_to_ida_us_"].combine_first(df["repaid_to_ibrd"])
+        df = df.drop(columns=repaid_columns)
 
     # Rename columns if they exist
-    rename_map = {
-        "end_of_period": "period",
-        "repaid_to_ida_us_": "repayment",
-        "repaid_to_ibrd": "repayment",
-    }
+    return df.rename(columns=RENAMED_COLUMNS)
 
-    return df.rename(columns=rename_map)
+
+def _translate_filter(filter_expression: str, schema: pa.Schema) -> Optional[list]:
+    """Translate an API filter expression to a pyarrow filter on the cleaned data.
+
+    Only simple comparisons, optionally joined by 'and', are supported (e.g.
+    "end_of_period>='01-Sep-2024'"). Column names are mapped as in
+    clean_ida_ibrd_response, and values are converted to the column's type.
+
+    Returns:
+        A list of (column, operator, value) filters, or None if the expression
+        can't be translated.
+    """
+    filters = []
+    for condition in re.split(r"\s+and\s+", filter_expression, flags=re.IGNORECASE):
+        match = _FILTER_CONDITION.match(condition)
+        if match is None:
+            return None
+
+        column, operator, value = match.groups()
+        column = RENAMED_COLUMNS.get(column, column)
+        if column not in schema.names:
+            return None
+
+        field_type = schema.field(column).type
+        try:
+            if pa.types.is_timestamp(field_type):
+                value = pd.to_datetime(value, format=DATE_FORMAT)
+            elif pa.types.is_integer(field_type) or pa.types.is_floating(field_type):
+                value = float(value)
+            elif not pa.types.is_string(field_type):
+                return None
+        except ValueError:
+            return None
+
+        filters.append((column, "==" if operator == "=" else operator, value))
+
+    return filters
+
+
+def _write_parquet(table: pa.Table, output_filepath: Path) -> None:
+    """Write a table to Parquet.
+
+    ZSTD and dictionary encoding suit the many low-cardinality string columns
+    (countries, loan types, project names). Statistics allow filtered reads.
+    """
+    pq.write_table(
+        table,
+        output_filepath,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+        data_page_size=1 << 20,
+        write_statistics=True,
+    )
 
 
 def download_and_save_data(
@@ -109,9 +342,16 @@ def download_and_save_data(
     filter_expression: Optional[str],
     max_records: int,
     output_filepath: Path,
-) -> None:
+    use_cache: bool = False,
+) -> pd.DataFrame:
     """Downloads data from the API in paginated form, cleans it, and saves to Parquet.
 
+    If `use_cache` is True and the file already exists, nothing is downloaded and the
+    file is left as it is. The selected fields and filter expression, if any, are
+    applied when reading the local file instead. If they can't be applied locally
+    (e.g. a complex filter, or a field missing from the file), the data is
+    downloaded and saved as usual.
+
     Args:
         dataset_id: The dataset identifier for the API.
         resource_id: The resource identifier for the API.
@@ -119,8 +359,34 @@ def download_and_save_data(
         filter_expression: A string representing the filter condition (passed to 'filter' parameter).
         max_records: Number of records to fetch per page.
         output_filepath: Local file path where the resulting Parquet file will be saved.
+        use_cache: Whether to reuse an existing file at output_filepath.
         cleaning_func: Optional function to clean or transform the data before saving.
+
+    Returns:
+        The cleaned data, either downloaded or read (and filtered) from the local file.
     """
+    # Use the local file instead of downloading again, if allowed and possible
+    if use_cache and output_filepath.exists():
+        schema = pq.read_schema(output_filepath)
+        columns = (
+            [RENAMED_COLUMNS.get(c, c) for c in select_fields]
+            if select_fields
+            else None
+        )
+        filters = (
+            _translate_filter(filter_expression, schema=schema)
+            if filter_expression
+            else None
+        )
+
+        if (columns is None or set(columns) <= set(schema.names)) and (
+            filter_expression is None or filters is not None
+        ):
+            # Row groups which can't match the filter are skipped using statistics
+            return pq.read_table(
+                output_filepath, columns=columns, filters=filters
+            ).to_pandas()
+
     df = fetch_paginated_data(
         dataset_id=dataset_id,
         resource_id=resource_id,
@@ -131,7 +397,9 @@ def download_and_save_data(
 
     df = clean_ida_ibrd_response(df)
 
-    df.reset_index(drop=True).to_parquet(output_filepath)
+    _write_parquet(pa.Table.from_pandas(df, preserve_index=False), output_filepath)
+
+    return df
 
 
 def download_ida_interest() -> None:
@@ -167,7 +435,7 @@ def download_ibrd_interest() -> None:
 
 
 def zero_to_nan(df: pd.DataFrame, column: str) -> pd.DataFrame:
-    df[column] = df[column].replace(0, pd.NA)
+    df[column] = df[column].mask(df[column] == 0)
 
     return df
 
@@ -186,19 +454,103 @@ def harmonise_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def deduplicate(df: pd.DataFrame) -> pd.DataFrame:
+    # ignore_index gives the result a RangeIndex, rather than the surviving row labels
     return df.drop_duplicates(
-        subset=["loan_or_credit_number", "country_code", "project_id"], keep="last"
+        subset=["loan_or_credit_number", "country_code", "project_id"],
+        keep="last",
+        ignore_index=True,
     )
 
 
-def get_ida_interest() -> pd.DataFrame:
-    """Loads and aggregates IDA interest data from local Parquet.
+def _read_group_max(
+    path: Path, idx_cols: list[str], value_cols: list[str]
+) -> pd.DataFrame:
+    """Read the columns needed for a summary from a local Parquet file, group by the
+    index columns and keep the max of the value columns.
 
-    Returns:
-        A DataFrame summarizing IDA interest.
+    The grouping runs in Arrow's multithreaded hash aggregation, before converting
+    the (much smaller) result to pandas. Groups are sorted by the index columns,
+    with missing keys last, as a pandas groupby(sort=True, dropna=False) would.
     """
-    ida_path = config.Paths.raw_data / "ida_interest.parquet"
-    ida = pd.read_parquet(ida_path)
+    table = pq.read_table(path, columns=idx_cols + value_cols, memory_map=True)
+
+    grouped = table.group_by(idx_cols).aggregate(
+        [(column, "max") for column in value_cols]
+    )
+
+    # Arrow names the aggregated columns '<column>_max'
+    grouped = grouped.select(
+        idx_cols + [f"{column}_max" for column in value_cols]
+    ).rename_columns(idx_cols + value_cols)
+
+    grouped = grouped.sort_by(
+        [(column, "ascending") for column in idx_cols], null_placement="at_end"
+    )
+
+    return _table_to_pandas(grouped)
+
+
+def _table_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convert an Arrow table to pandas, with missing strings as NaN (Arrow converts
+    them to None), as pandas does."""
+    df = table.to_pandas()
+
+    string_cols = [
+        field.name for field in table.schema if pa.types.is_string(field.type)
+    ]
+    df[string_cols] = df[string_cols].where(df[string_cols].notna())
+
+    return df
+
+
+def _summary_path(path: Path) -> Path:
+    """Path of the saved summary of a raw data file, e.g. ida_interest.summary.parquet"""
+    return path.with_suffix(".summary.parquet")
+
+
+def _read_saved_summary(path: Path) -> Optional[pd.DataFrame]:
+    """Read the saved summary of a raw data file, if it is newer than the file and
+    was saved by the current SUMMARY_VERSION."""
+    summary_path = _summary_path(path)
+
+    if (
+        not summary_path.exists()
+        or summary_path.stat().st_mtime_ns < path.stat().st_mtime_ns
+    ):
+        return None
+
+    metadata = pq.read_schema(summary_path).metadata or {}
+    if metadata.get(b"summary_version") != str(SUMMARY_VERSION).encode():
+        return None
+
+    return _table_to_pandas(pq.read_table(summary_path, memory_map=True))
+
+
+def _save_summary(summary: pd.DataFrame, path: Path) -> None:
+    """Save the summary of a raw data file next to it, for later sessions.
+
+    Saving is optional: if the file can't be written (e.g. a read-only directory),
+    the summary is simply computed again next time.
+    """
+    table = pa.Table.from_pandas(summary, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, b"summary_version": str(SUMMARY_VERSION).encode()}
+    )
+
+    try:
+        pq.write_table(table, _summary_path(path), compression="zstd")
+    except OSError as e:
+        logger.warning(f"Could not save the summary of {path.name}: {e}")
+
+
+@lru_cache(maxsize=1)
+def _summarise_ida(ida_path: Path, mtime_ns: int) -> pd.DataFrame:
+    """Summarise IDA interest data. Results are cached by path and modification time,
+    so that a re-downloaded file is summarised again. The summary is also saved next
+    to the file, and reused by later sessions until the file changes."""
+    saved_summary = _read_saved_summary(ida_path)
+    if saved_summary is not None:
+        return saved_summary
 
     idx_cols = [
         "credit_number",
@@ -207,29 +559,30 @@ def get_ida_interest() -> pd.DataFrame:
         "project_id",
         "project_name",
     ]
+    value_cols = ["country", "service_charge_rate", "original_principal_amount_us_"]
+
+    # Only read the columns needed for the summary
+    ida = _read_group_max(ida_path, idx_cols=idx_cols, value_cols=value_cols)
 
     ida_summary = (
-        ida.groupby(idx_cols, dropna=False, observed=True)[
-            ["country", "service_charge_rate", "original_principal_amount_us_"]
-        ]
-        .max()
-        .reset_index()
-        .pipe(zero_to_nan, column="service_charge_rate")
-        .pipe(harmonise_columns)
+        ida.pipe(harmonise_columns)
         .pipe(deduplicate)
+        .pipe(zero_to_nan, column="interest_rate")
     )
 
+    _save_summary(ida_summary, ida_path)
+
     return ida_summary
 
 
-def get_ibrd_interest() -> pd.DataFrame:
-    """Loads and aggregates IBRD interest data from local Parquet.
-
-    Returns:
-        A DataFrame summarizing IBRD interest.
-    """
-    ibrd_path = config.Paths.raw_data / "ibrd_interest.parquet"
-    ibrd = pd.read_parquet(ibrd_path)
+@lru_cache(maxsize=1)
+def _summarise_ibrd(ibrd_path: Path, mtime_ns: int) -> pd.DataFrame:
+    """Summarise IBRD interest data. Results are cached by path and modification time,
+    so that a re-downloaded file is summarised again. The summary is also saved next
+    to the file, and reused by later sessions until the file changes."""
+    saved_summary = _read_saved_summary(ibrd_path)
+    if saved_summary is not None:
+        return saved_summary
 
     idx_cols = [
         "loan_number",
@@ -239,21 +592,50 @@ def get_ibrd_interest() -> pd.DataFrame:
         "project_name_",
         "loan_type",
     ]
+    value_cols = ["country", "interest_rate", "original_principal_amount"]
+
+    # Only read the columns needed for the summary
+    ibrd = _read_group_max(ibrd_path, idx_cols=idx_cols, value_cols=value_cols)
 
     ibrd_summary = (
-        ibrd.groupby(idx_cols, dropna=False, observed=True)[
-            ["country", "interest_rate", "original_principal_amount"]
-        ]
-        .max()
-        .reset_index()
-        .pipe(zero_to_nan, column="interest_rate")
-        .pipe(harmonise_columns)
+        ibrd.pipe(harmonise_columns)
         .pipe(deduplicate)
+        .pipe(zero_to_nan, column="interest_rate")
     )
 
+    _save_summary(ibrd_summary, ibrd_path)
+
     return ibrd_summary
 
 
+def get_ida_interest() -> pd.DataFrame:
+    """Loads and aggregates IDA interest data from local Parquet.
+
+    The summary is computed once per session (unless the file changes). Callers get
+    a copy, so they can modify it safely.
+
+    Returns:
+        A DataFrame summarizing IDA interest.
+    """
+    ida_path = config.Paths.raw_data / "ida_interest.parquet"
+
+    return _summarise_ida(ida_path, ida_path.stat().st_mtime_ns).copy()
+
+
+def get_ibrd_interest() -> pd.DataFrame:
+    """Loads and aggregates IBRD interest data from local Parquet.
+
+    The summary is computed once per session (unless the file changes). Callers get
+    a copy, so they can modify it safely.
+
+    Returns:
+        A DataFrame summarizing IBRD interest.
+    """
+    ibrd_path = config.Paths.raw_data / "ibrd_interest.parquet"
+
+    return _summarise_ibrd(ibrd_path, ibrd_path.stat().st_mtime_ns).copy()
+
+
 if __name__ == "__main__":
     download_ida_interest()
     download_ibrd_interest()